@@ -22,6 +22,8 @@ from __future__ import annotations
 import argparse
 from pathlib import Path
 from datetime import datetime
+import numpy as np
+import openpyxl
 import pandas as pd
 
 # 내부 모듈
@@ -44,8 +46,8 @@ def build_s1_snapshot(df: pd.DataFrame, cfg: SC.Config) -> pd.DataFrame:
     # A/B/C 및 괴리율
     snap = SC.s1_compute_levels(snap, cfg)
 
-    # 표시 컬럼 가공
-    snap["mcap_억원"] = (snap[cfg.col_mcap] / 1e8).round(0).astype("Int64")
+    # 표시 컬럼 가공 (시총 필터 통과분이라 NaN 없음 → nullable Int64 불필요)
+    snap["mcap_억원"] = np.rint(snap[cfg.col_mcap].to_numpy() * 1e-8).astype(np.int64)
     snap["is_ge_5trn"] = snap[SC.DEF_MC_FLAG]
     # 닿음 여부 플래그(현재가가 하단 지지선 이하이면 True)
     snap["touch_env_lower"] = snap[cfg.col_close] <= snap["env_lower"]
@@ -71,14 +73,17 @@ def build_s1_snapshot(df: pd.DataFrame, cfg: SC.Config) -> pd.DataFrame:
     # 누락 방지
     out_cols = [c for c in out_cols if c in snap.columns]
 
-    out = snap[out_cols].copy()
-    # 포맷(표시용): 소수점 2자리
-    for col in [cfg.col_close, "ma20", "env_lower", SC.S1_B, SC.S1_C]:
-        if col in out.columns:
-            out[col] = out[col].round(2)
-    for col in [SC.S1_GAP_A, SC.S1_GAP_B, SC.S1_GAP_C]:
-        if col in out.columns:
-            out[col] = out[col].round(2)
+    out = snap.loc[:, out_cols]
+    # 포맷(표시용): 소수점 2자리 — 컬럼 그룹 단위로 한 번에 반올림.
+    # float64 유지 — float32는 8.4만원대 이상 가격에서 반올림 값을 표현하지 못해
+    # 엑셀에 잔여 소수 자릿수가 노출된다.
+    round_cols = [
+        c for c in (cfg.col_close, "ma20", "env_lower", SC.S1_B, SC.S1_C,
+                    SC.S1_GAP_A, SC.S1_GAP_B, SC.S1_GAP_C)
+        if c in out.columns
+    ]
+    if round_cols:
+        out[round_cols] = out[round_cols].round(2)
 
     return out
 
@@ -91,10 +96,53 @@ def load_input(path: Path, cfg: SC.Config) -> pd.DataFrame:
     return SC.load_prices_csv(str(path), cfg)
 
 
-def save_to_excel(df: pd.DataFrame, output_path: Path) -> None:
+# 행 수 기준 저장 경로 선택:
+#  - SMALL_XLSX_ROWS 이하: 기본 to_excel (스트리밍 준비 오버헤드가 더 큼)
+#  - CSV_SIDECAR_ROWS 초과: xlsx 외에 압축 CSV 사이드카 병행 (아카이브/재처리용)
+SMALL_XLSX_ROWS = 1_000
+CSV_SIDECAR_ROWS = 10_000
+
+
+def _save_csv_sidecar(df: pd.DataFrame, xlsx_path: Path) -> Path:
+    try:
+        # pyarrow C++ 직렬화 + 내장 zstd 코덱 (xlsx 대비 수 배 작음)
+        import pyarrow as pa
+        from pyarrow import csv as pacsv
+        out = xlsx_path.with_name(xlsx_path.stem + ".csv.zst")
+        table = pa.Table.from_pandas(df, preserve_index=False)
+        with pa.output_stream(str(out), compression="zstd") as f:
+            pacsv.write_csv(table, f)
+    except Exception:
+        out = xlsx_path.with_name(xlsx_path.stem + ".csv")
+        df.to_csv(out, index=False, encoding="utf-8-sig")
+    return out
+
+
+def save_to_excel(
+    df: pd.DataFrame,
+    output_path: Path,
+    small_xlsx_rows: int = SMALL_XLSX_ROWS,
+    csv_sidecar_rows: int = CSV_SIDECAR_ROWS,
+) -> None:
+    """행 수에 맞는 저장 경로 선택.
+
+    기본 ExcelWriter 경로는 셀 전체를 메모리에 올리므로(파일 크기의 수십 배)
+    스냅샷 행 수가 늘어나면 가장 큰 할당 지점이 된다 → write-only 모드로
+    행 단위 스트리밍. 소형 스냅샷은 기본 경로가 오히려 빠르고, 대형 내보내기는
+    압축 CSV 사이드카를 병행해 xlsx 소비자와 재처리 소비자를 모두 지원한다.
+    """
     output_path.parent.mkdir(parents=True, exist_ok=True)
-    with pd.ExcelWriter(output_path, engine="openpyxl") as writer:
-        df.to_excel(writer, index=False, sheet_name=SHEET_NAME)
+    if len(df) <= small_xlsx_rows:
+        df.to_excel(output_path, sheet_name=SHEET_NAME, index=False)
+    else:
+        wb = openpyxl.Workbook(write_only=True)
+        ws = wb.create_sheet(SHEET_NAME)
+        ws.append(list(df.columns))
+        for row in df.itertuples(index=False, name=None):
+            ws.append(row)
+        wb.save(output_path)
+    if len(df) > csv_sidecar_rows:
+        _save_csv_sidecar(df, output_path)
 
 
 # ===========================
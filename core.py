@@ -0,0 +1,130 @@
+"""
+S2 코어 로직
+- 리플레이 CSV 로더, 주도주/유니버스 분리, 테이블별 행 변환
+"""
+from __future__ import annotations
+import pandas as pd
+from pathlib import Path
+from typing import Tuple, Dict
+from datetime import datetime
+
+from db_utils import upsert_many
+
+TURNOVER_THRESHOLD_EOK = 5000  # 거래대금 기준(억원)
+
+# 리플레이 CSV 스키마 (파싱 단계에서 타입 확정 → 문자열 중간 산출물 제거)
+_REPLAY_DTYPES = {
+    "date": "string",
+    "ticker": "string",
+    "name": "string",
+    "market": "string",
+    "open": "float32",
+    "high": "float32",
+    "low": "float32",
+    "close": "float32",
+}
+
+
+# 리플레이 CSV에서 등장하는 날짜 표기 — 명시 포맷 파싱이 dateutil 추론보다 훨씬 빠름
+_REPLAY_DATE_FORMATS = ("%Y.%m.%d", "%Y-%m-%d", "%Y%m%d")
+
+
+def _parse_replay_dates(s: pd.Series) -> pd.Series:
+    for fmt in _REPLAY_DATE_FORMATS:
+        try:
+            return pd.to_datetime(s, format=fmt)
+        except ValueError:
+            continue
+    # 알 수 없는 표기 → 요소별 추론 (느리지만 마지막 수단)
+    return pd.to_datetime(s)
+
+
+def load_replay_daily(csv_path: Path) -> pd.DataFrame:
+    try:
+        # pyarrow 엔진: 멀티스레드 파싱 + 명시 스키마
+        df = pd.read_csv(csv_path, dtype=_REPLAY_DTYPES, engine="pyarrow", encoding="utf-8-sig")
+    except Exception:
+        # pyarrow 미설치 또는 변칙 CSV(중복/무명 컬럼 등) → 기본 엔진으로 폴백
+        df = pd.read_csv(csv_path, dtype=_REPLAY_DTYPES, low_memory=False, encoding="utf-8-sig")
+
+    want = ["date", "ticker", "name", "market", "open", "high", "low", "close", "volume"]
+
+    # 필수 컬럼 검증
+    missing = [c for c in want if c not in df.columns]
+    if missing:
+        raise ValueError(f"CSV missing columns: {missing}")
+    # 티커 정규화: pyarrow 엔진은 dtype을 추론 후에 적용해 선행 0이 소실됨
+    # ("005930" → "5930"). KRX 티커는 6자리 고정이라 zfill로 엔진 무관하게 통일
+    # — ticker는 전 테이블의 PK 구성요소라 표기가 갈리면 같은 종목이 두 키가 된다.
+    df["ticker"] = df["ticker"].astype("string").str.zfill(6)
+    # 날짜는 로드 시 한 번만 "YYYY-MM-DD" 문자열로 확정 — 이후 비교/저장은 전부
+    # 같은 표준 표기라 재파싱이 없다 (SQLite도 TEXT로 저장)
+    df["date"] = _parse_replay_dates(df["date"]).dt.strftime("%Y-%m-%d")
+    for col in ("open", "high", "low", "close"):
+        df[col] = pd.to_numeric(df[col], errors="coerce")
+    df["volume"] = pd.to_numeric(df["volume"], errors="coerce").fillna(0).astype(int)
+    df.dropna(subset=["close"], inplace=True)
+    # 거래대금(억원) = 종가 * 거래량 / 1e8
+    df["turnover_억원"] = df["close"] * df["volume"] / 1e8
+    return df
+
+
+def split_leaders_and_universe(df: pd.DataFrame, date_str: str) -> Tuple[pd.DataFrame, pd.DataFrame]:
+    leaders = df.query("turnover_억원 >= @TURNOVER_THRESHOLD_EOK").copy()
+    universe = df.copy()
+    leaders["date"] = date_str
+    universe["date"] = date_str
+    return leaders, universe
+
+
+def _columns_native(df: pd.DataFrame, cols):
+    """컬럼을 .to_numpy().tolist()로 한 번에 네이티브 파이썬 값으로 변환.
+
+    행 단위 딕셔너리 구성 대신 컬럼 단위 일괄 변환 → zip으로 튜플 생성.
+    sqlite3 바인딩도 numpy 스칼라가 아닌 네이티브 타입만 받는다.
+    """
+    return [df[c].to_numpy().tolist() for c in cols]
+
+
+def build_rows_for_tables(leaders: pd.DataFrame, universe: pd.DataFrame, mktcaps: Dict[str, float] | None = None, date_str: str = ""):
+    """테이블별 행(위치 파라미터 튜플)을 제너레이터로 반환.
+
+    UPSERT_SQL의 컬럼 나열 순서와 튜플 순서가 일치해야 한다.
+    upsert_many가 청크 단위로 소비하므로 전체 행을 동시에 메모리에 올리지 않는다.
+    """
+
+    def lhist():
+        # (date, ticker, name, market, close, volume, turnover_억원, mktcap_억원, first_seen, last_seen)
+        cols = _columns_native(leaders, ["date", "ticker", "name", "market", "close", "volume", "turnover_억원"])
+        for date, tkr, name, market, close, volume, turn in zip(*cols):
+            mc = mktcaps.get(str(tkr)) if mktcaps else None
+            yield (date, tkr, name, market, close, int(volume), turn,
+                   float(mc) if mc is not None else None, date, date)
+
+    def levents():
+        # (ticker, date, turnover_억원, close, high, low, volume)
+        cols = _columns_native(leaders, ["ticker", "date", "turnover_억원", "close", "high", "low", "volume"])
+        for tkr, date, turn, close, high, low, volume in zip(*cols):
+            yield (tkr, date, turn, close, high, low, int(volume))
+
+    def wuniv():
+        # (ticker, name, market, first_seen, last_seen, times_above_5k, last_turnover_억원)
+        # 신규 진입 카운터는 0으로 삽입 — 증가는 increment_times_above_5k의 UPDATE가 담당
+        leader_set = set(leaders["ticker"].to_numpy().tolist())
+        turns = leaders.drop_duplicates("ticker").set_index("ticker")["turnover_억원"].to_dict()
+        firsts = universe.drop_duplicates("ticker")
+        cols = _columns_native(firsts, ["ticker", "name", "market"])
+        for tkr, name, market in zip(*cols):
+            in_leaders = tkr in leader_set
+            yield (tkr, name, market, date_str,
+                   date_str if in_leaders else None,
+                   0,
+                   float(turns[tkr]) if in_leaders else None)
+
+    def pdaily():
+        # (date, ticker, open, high, low, close, volume, turnover_억원)
+        cols = _columns_native(universe, ["date", "ticker", "open", "high", "low", "close", "volume", "turnover_억원"])
+        for date, tkr, op, high, low, close, volume, turn in zip(*cols):
+            yield (date, tkr, op, high, low, close, int(volume), turn)
+
+    return lhist(), levents(), wuniv(), pdaily()
@@ -0,0 +1,198 @@
+"""
+S2 DB 유틸리티
+- SQLite 스키마(DDL)와 UPSERT SQL 정의
+- 연결/초기화/일괄 UPSERT 헬퍼
+"""
+from __future__ import annotations
+import itertools
+import sqlite3
+from pathlib import Path
+from typing import Iterable, Sequence, Any
+
+# executemany 1회당 묶는 행 수 (커밋 단위가 아니라 바인딩 단위)
+UPSERT_CHUNK_ROWS = 10_000
+
+# ===========================
+# 1) 스키마 (DDL)
+# ===========================
+DDL = {
+    "leaders_history": """
+        CREATE TABLE IF NOT EXISTS leaders_history (
+            date TEXT NOT NULL,
+            ticker TEXT NOT NULL,
+            name TEXT,
+            market TEXT,
+            close REAL,
+            volume INTEGER,
+            turnover_억원 REAL,
+            mktcap_억원 REAL,
+            first_seen TEXT,
+            last_seen TEXT,
+            PRIMARY KEY(date, ticker)
+        )
+        """,
+    "leaders_events": """
+        CREATE TABLE IF NOT EXISTS leaders_events (
+            ticker TEXT NOT NULL,
+            date TEXT NOT NULL,
+            turnover_억원 REAL,
+            close REAL,
+            high REAL,
+            low REAL,
+            volume INTEGER,
+            PRIMARY KEY(ticker, date)
+        )
+        """,
+    "watch_universe": """
+        CREATE TABLE IF NOT EXISTS watch_universe (
+            ticker TEXT PRIMARY KEY,
+            name TEXT,
+            market TEXT,
+            first_seen TEXT,
+            last_seen TEXT,
+            times_above_5k INTEGER DEFAULT 0,
+            last_turnover_억원 REAL
+        )
+        """,
+    "prices_daily": """
+        CREATE TABLE IF NOT EXISTS prices_daily (
+            date TEXT NOT NULL,
+            ticker TEXT NOT NULL,
+            open REAL,
+            high REAL,
+            low REAL,
+            close REAL,
+            volume INTEGER,
+            turnover_억원 REAL,
+            PRIMARY KEY(date, ticker)
+        )
+        """,
+}
+
+# 보조 인덱스 — PK(date, ticker)는 "날짜 X에 무슨 일이" 질의용이고,
+# S1/S2 분석 읽기는 "티커 Y의 전체 이력"이라 (ticker, date) 범위 스캔이 필요
+INDEX_DDL = (
+    "CREATE INDEX IF NOT EXISTS idx_prices_ticker_date ON prices_daily(ticker, date)",
+    "CREATE INDEX IF NOT EXISTS idx_leaders_history_ticker ON leaders_history(ticker)",
+)
+
+# ===========================
+# 2) UPSERT SQL (위치 파라미터 — 바인딩 순서는 컬럼 나열 순서와 동일)
+# ===========================
+UPSERT_SQL = {
+    "leaders_history": """
+        INSERT INTO leaders_history
+        (date, ticker, name, market, close, volume, turnover_억원, mktcap_억원, first_seen, last_seen)
+        VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+        ON CONFLICT(date, ticker) DO UPDATE SET
+            name=excluded.name,
+            market=excluded.market,
+            close=excluded.close,
+            volume=excluded.volume,
+            turnover_억원=excluded.turnover_억원,
+            mktcap_억원=excluded.mktcap_억원,
+            first_seen=MIN(leaders_history.first_seen, excluded.first_seen),
+            last_seen=excluded.last_seen
+        """,
+    "leaders_events": """
+        INSERT INTO leaders_events
+        (ticker, date, turnover_억원, close, high, low, volume)
+        VALUES (?, ?, ?, ?, ?, ?, ?)
+        ON CONFLICT(ticker, date) DO UPDATE SET
+            turnover_억원=excluded.turnover_억원,
+            close=excluded.close,
+            high=excluded.high,
+            low=excluded.low,
+            volume=excluded.volume
+        """,
+    "watch_universe": """
+        INSERT INTO watch_universe
+        (ticker, name, market, first_seen, last_seen, times_above_5k, last_turnover_억원)
+        VALUES (?, ?, ?, ?, ?, ?, ?)
+        ON CONFLICT(ticker) DO UPDATE SET
+            name=excluded.name,
+            market=excluded.market,
+            first_seen=COALESCE(watch_universe.first_seen, excluded.first_seen),
+            last_seen=COALESCE(excluded.last_seen, watch_universe.last_seen),
+            times_above_5k=watch_universe.times_above_5k,
+            last_turnover_억원=excluded.last_turnover_억원
+        """,
+    "prices_daily": """
+        INSERT INTO prices_daily
+        (date, ticker, open, high, low, close, volume, turnover_억원)
+        VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+        ON CONFLICT(date, ticker) DO UPDATE SET
+            open=excluded.open,
+            high=excluded.high,
+            low=excluded.low,
+            close=excluded.close,
+            volume=excluded.volume,
+            turnover_억원=excluded.turnover_억원
+        """,
+}
+
+# ===========================
+# 3) 헬퍼
+# ===========================
+def ensure_dirs(*paths: Path) -> None:
+    for p in paths:
+        p.mkdir(parents=True, exist_ok=True)
+
+
+def get_conn(db_path: Path, replay_mode: bool = False) -> sqlite3.Connection:
+    # prepared statement LRU 확장 (기본 128) — 재연결 전까지 파싱 1회로 재사용
+    conn = sqlite3.connect(str(db_path), cached_statements=256)
+    conn.execute("PRAGMA journal_mode=WAL;")
+    conn.execute("PRAGMA cache_spill=0;")
+    conn.execute("PRAGMA synchronous=NORMAL;")
+    conn.execute("PRAGMA temp_store=MEMORY;")
+    conn.execute("PRAGMA cache_size=-262144;")    # 256MB 페이지 캐시
+    conn.execute("PRAGMA mmap_size=268435456;")   # 256MB mmap
+    if replay_mode:
+        # 리플레이는 CSV가 원본이라 DB 재구축 가능 → 커밋 fsync 생략해도 안전
+        conn.execute("PRAGMA synchronous=OFF;")
+        conn.execute("PRAGMA locking_mode=EXCLUSIVE;")
+    return conn
+
+
+def init_db(conn: sqlite3.Connection) -> None:
+    cur = conn.cursor()
+    for sql in DDL.values():
+        cur.execute(sql)
+    for sql in INDEX_DDL:
+        cur.execute(sql)
+    # UPSERT 문 선컴파일 — 문장 캐시는 SQL 텍스트가 키이므로 실제 문장 그대로
+    # 빈 바인딩 executemany로 넣어야 핫 루프 첫 호출이 캐시를 탄다.
+    # DML executemany는 빈 시퀀스라도 암묵 트랜잭션을 여므로 마지막에 commit으로
+    # 닫는다 — 안 닫으면 호출자의 BEGIN IMMEDIATE가 중첩 트랜잭션 오류가 된다.
+    for sql in UPSERT_SQL.values():
+        cur.executemany(sql, [])
+    conn.commit()
+
+
+def upsert_many(conn: sqlite3.Connection, table: str, rows: Iterable[Sequence[Any]]) -> int:
+    """rows를 청크 단위 executemany로 업서트. 처리한 행 수를 반환.
+
+    커밋은 한 번만 수행한다. 호출자가 이미 트랜잭션을 열어 둔 경우
+    (예: run_replay의 BEGIN IMMEDIATE) 커밋을 호출자에게 맡긴다.
+    """
+    sql = UPSERT_SQL[table]
+    cur = conn.cursor()
+    it = iter(rows)
+    total = 0
+
+    def _run() -> None:
+        nonlocal total
+        while True:
+            chunk = list(itertools.islice(it, UPSERT_CHUNK_ROWS))
+            if not chunk:
+                break
+            cur.executemany(sql, chunk)
+            total += len(chunk)
+
+    if conn.in_transaction:
+        _run()
+    else:
+        with conn:  # 단일 트랜잭션 → fsync 1회
+            _run()
+    return total
@@ -0,0 +1,146 @@
+"""
+S2 메인 (Phase 0.5: replay 모드)
+- config.yml 로드 → 리플레이 CSV 적재 → SQLite 업서트 → 백업 CSV
+"""
+from __future__ import annotations
+import sys
+import yaml
+from pathlib import Path
+from datetime import datetime
+import sqlite3
+from typing import Iterable
+import numpy as np
+import pandas as pd
+
+from db_utils import ensure_dirs, get_conn, init_db, upsert_many
+from core import load_replay_daily, split_leaders_and_universe, build_rows_for_tables, TURNOVER_THRESHOLD_EOK
+
+
+DEFAULT_CFG = {
+    "mode": "replay",
+    "test_date": "2025-09-30",
+    "paths": {
+        "db": "/Users/lll/Documents/Macoding/S12/s2.sqlite",
+        "backup": "/Users/lll/Documents/Macoding/S12/backup/",
+        "replay_csv": "/Users/lll/Documents/Macoding/S12/replay/ohlcv_2025-09-30.csv",
+    },
+    "seed_days": 0,
+}
+
+
+# libyaml C 로더가 있으면 사용 (순수 파이썬 SafeLoader 대비 수 배 빠름)
+_YAML_LOADER = getattr(yaml, "CSafeLoader", yaml.SafeLoader)
+
+
+def load_config(cfg_path: Path) -> dict:
+    if not cfg_path.exists():
+        return DEFAULT_CFG
+    with cfg_path.open("r", encoding="utf-8") as f:
+        data = yaml.load(f, Loader=_YAML_LOADER) or {}
+
+    # 중첩은 paths 한 단계뿐 → 재귀 병합 대신 2단 평면 병합
+    cfg = {**DEFAULT_CFG, **data}
+    cfg["paths"] = {**DEFAULT_CFG["paths"], **(data.get("paths") or {})}
+    return cfg
+
+
+def increment_times_above_5k(conn: sqlite3.Connection, wuniv_rows: Iterable[tuple], today_leaders: pd.DataFrame, date_str: str) -> int:
+    """watch_universe 갱신을 전부 SQL로 처리.
+
+    - 유니버스 행 업서트: first_seen/last_seen은 UPSERT SQL의 COALESCE로 보존,
+      times_above_5k는 기존 값 유지(신규 진입은 0으로 삽입 — 튜플에 포함)
+    - 카운터 증가: 오늘 주도주 티커만 PK 기준 UPDATE (유니버스 전체를 파이썬으로
+      순회하지 않으므로 주도주 수에만 비례)
+    """
+    cur = conn.cursor()
+    n = upsert_many(conn, "watch_universe", wuniv_rows)
+
+    # 주도주(수십 건)만 PK 포인트 UPDATE — 유니버스 규모와 무관
+    cur.executemany(
+        "UPDATE watch_universe SET times_above_5k = times_above_5k + 1, last_seen = ? WHERE ticker = ?",
+        ((date_str, t) for t in today_leaders["ticker"].drop_duplicates().tolist()),
+    )
+    return n
+
+
+def backup_today_csv(df_leaders: pd.DataFrame, backup_dir: Path, date_str: str) -> None:
+    backup_dir.mkdir(parents=True, exist_ok=True)
+    out = backup_dir / f"leaders_{date_str.replace('-', '')}.csv"
+    cols = ["date", "ticker", "name", "market", "close", "volume", "turnover_억원"]
+    sel = df_leaders[cols]
+    try:
+        # pyarrow C++ CSV 직렬화 (pandas to_csv의 행 단위 파이썬 포매팅 회피)
+        import pyarrow as pa
+        from pyarrow import csv as pacsv
+        table = pa.Table.from_pandas(sel, preserve_index=False)
+        with open(out, "wb") as f:
+            f.write(b"\xef\xbb\xbf")  # 엑셀 한글 호환 BOM (utf-8-sig)
+            pacsv.write_csv(table, f, write_options=pacsv.WriteOptions(include_header=True))
+    except ImportError:
+        sel.to_csv(out, index=False, encoding="utf-8-sig")
+
+
+def run_replay(cfg: dict) -> None:
+    date_str = cfg["test_date"]
+    paths = cfg["paths"]
+    db_path = Path(paths["db"]).expanduser()
+    backup_dir = Path(paths["backup"]).expanduser()
+    replay_csv = Path(paths.get("replay_csv", "")).expanduser()
+
+    ensure_dirs(db_path.parent, backup_dir)
+
+    # 1) CSV 로드 + 날짜 검증
+    df = load_replay_daily(replay_csv)
+    # "전부 같은 날짜인가"만 보면 되므로 nunique 해시 대신 단일 벡터 비교
+    dates = df["date"].to_numpy()
+    if len(dates) == 0 or dates[0] != date_str or not (dates == dates[0]).all():
+        raise ValueError(f"CSV date mismatch. expected {date_str}, got {np.unique(dates).tolist()}")
+
+    leaders, universe = split_leaders_and_universe(df, date_str)
+
+    lhist, levents, wuniv, pdaily = build_rows_for_tables(leaders, universe, mktcaps=None, date_str=date_str)
+
+    # 2) DB 적재
+    conn = get_conn(db_path, replay_mode=True)
+    init_db(conn)
+
+    # 4개 테이블을 한 트랜잭션으로 묶어 커밋(fsync)을 1회로 줄임
+    conn.execute("BEGIN IMMEDIATE")
+    n1 = upsert_many(conn, "leaders_history", lhist)
+    n2 = upsert_many(conn, "leaders_events", levents)
+    n3 = upsert_many(conn, "prices_daily", pdaily)
+    n4 = increment_times_above_5k(conn, wuniv, leaders, date_str)
+    conn.commit()
+    # 런 사이에 WAL이 무한히 자라지 않도록 정리 후 잠금 해제
+    conn.execute("PRAGMA wal_checkpoint(TRUNCATE);")
+    conn.close()
+
+    # 3) 백업 CSV
+    backup_today_csv(leaders, backup_dir, date_str)
+
+    # 4) 요약
+    print("==== REPLAY SUMMARY ====")
+    print(f"date              : {date_str}")
+    print(f"leaders threshold : {TURNOVER_THRESHOLD_EOK} 억원")
+    print(f"leaders count     : {len(leaders)} / universe: {len(universe)}")
+    print(f"upsert leaders_history : {n1}")
+    print(f"upsert leaders_events  : {n2}")
+    print(f"upsert prices_daily    : {n3}")
+    print(f"upsert watch_universe  : {n4}")
+
+
+def main():
+    root = Path(__file__).resolve().parent
+    cfg_path = root / "config.yml"
+    cfg = load_config(cfg_path)
+
+    mode = cfg.get("mode", "replay").lower()
+    if mode == "replay":
+        run_replay(cfg)
+        return
+
+    raise NotImplementedError("normal(OpenAPI) mode will be added in Phase 1.0 (Windows + Kiwoom)")
+
+
+if __name__ == "__main__":
+    main()
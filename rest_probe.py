@@ -434,6 +434,15 @@ import time
 from typing import Any, Dict, Optional, Tuple
 
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+# orjson(러스트 구현)이 있으면 JSON 직렬화/파싱을 3~10배 빠르게 처리.
+# 미설치 환경에서는 표준 json으로 폴백.
+try:
+    import orjson
+except ImportError:
+    orjson = None
 
 
 def _ts() -> str:
@@ -442,30 +451,53 @@ def _ts() -> str:
 
 def save_json(data: Dict[str, Any], out_path: str) -> None:
     os.makedirs(os.path.dirname(out_path), exist_ok=True)
+    if orjson is not None:
+        with open(out_path, "wb") as f:
+            f.write(orjson.dumps(data, option=orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS))
+        return
     with open(out_path, "w", encoding="utf-8") as f:
         json.dump(data, f, ensure_ascii=False, indent=2)
 
 
 def load_latest_cache(out_dir: str) -> Tuple[Optional[Dict[str, Any]], Optional[str]]:
-    pattern = os.path.join(out_dir, "*.json")
-    files = sorted(glob.glob(pattern), key=os.path.getmtime, reverse=True)
-    for path in files:
+    # scandir 1회 순회: DirEntry가 stat을 캐시하므로 파일당 syscall 1번
+    try:
+        with os.scandir(out_dir) as it:
+            entries = [(e.stat().st_mtime, e.path) for e in it if e.name.endswith(".json") and e.is_file()]
+    except OSError:
+        return None, None
+    entries.sort(reverse=True)
+    # 최신 파일부터 시도 (손상된 JSON이면 다음 파일로 폴백)
+    for _, path in entries:
         try:
-            with open(path, "r", encoding="utf-8") as f:
-                data = json.load(f)
+            with open(path, "rb") as f:
+                raw = f.read()
+            data = orjson.loads(raw) if orjson is not None else json.loads(raw)
             return data, path
         except Exception:
             continue
     return None, None
 
 
+# 세션 재사용: TCP+TLS 핸드셰이크를 런당 1회로. 5xx 재시도는 urllib3 Retry가
+# 지수 백오프(0.5s 기준)로 수행 — 수동 재시도 루프 불필요.
+_RETRY = Retry(
+    total=3,
+    backoff_factor=0.5,
+    status_forcelist=[500, 502, 503, 504],
+    allowed_methods=["POST"],
+)
+_SESSION = requests.Session()
+_SESSION.mount("https://", HTTPAdapter(pool_connections=1, pool_maxsize=4, max_retries=_RETRY))
+_SESSION.headers["Content-Type"] = "application/json"
+
+
 def fetch_rank(
     base_url: str,
     token: str,
     market: str = "ALL",
     count: int = 100,
     api_id: str = "ka10031",
-    retry_intervals = (0.5, 1.0, 2.0),
 ) -> Tuple[Optional[Dict[str, Any]], Optional[requests.Response], str]:
     """POST /api/dostk/rkinfo 로 랭크 데이터 요청.
 
@@ -473,57 +505,29 @@ def fetch_rank(
         - status: 'live' | 'retry' | 'fail'
     """
     url = f"{base_url.rstrip('/')}/api/dostk/rkinfo"
-    headers = {
-        "Authorization": f"Bearer {token}",
-        "Content-Type": "application/json",
-    }
+    headers = {"Authorization": f"Bearer {token}"}
     payload = {
         "api_id": api_id,  # 핵심: REST는 tr_cd 대신 api_id 사용
         "market": market,
         "count": int(count),
     }
 
-    last_resp: Optional[requests.Response] = None
-
-    # 최초 시도
     try:
-        resp = requests.post(url, headers=headers, json=payload, timeout=15)
-        last_resp = resp
-        if resp.status_code == 200:
-            try:
-                data = resp.json()
-            except Exception:
-                data = None
-            if data is not None:
-                return data, resp, 'live'
-        elif 500 <= resp.status_code < 600:
-            pass  # 재시도 진입
-        else:
-            return None, resp, 'fail'
+        resp = _SESSION.post(url, headers=headers, json=payload, timeout=15)
     except Exception:
-        pass
+        # 재시도 소진 포함 네트워크 예외
+        return None, None, 'fail'
 
-    # 재시도 (지수 백오프)
-    for sec in retry_intervals:
-        time.sleep(sec)
+    if resp.status_code == 200:
         try:
-            resp = requests.post(url, headers=headers, json=payload, timeout=15)
-            last_resp = resp
-            if resp.status_code == 200:
-                try:
-                    data = resp.json()
-                except Exception:
-                    data = None
-                if data is not None:
-                    return data, resp, 'retry'
-            elif 500 <= resp.status_code < 600:
-                continue
-            else:
-                return None, resp, 'fail'
+            data = resp.json()
         except Exception:
-            continue
+            data = None
+        if data is not None:
+            retried = bool(getattr(getattr(resp.raw, "retries", None), "history", None))
+            return data, resp, 'retry' if retried else 'live'
 
-    return None, last_resp, 'fail'
+    return None, resp, 'fail'
 
 
 def main():
@@ -9,8 +9,10 @@ S1 KRX Fetch & Envelope (v1.1.4)
 """
 from __future__ import annotations
 import argparse
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from datetime import datetime, timedelta
 from pathlib import Path
+from threading import Semaphore
 from typing import List
 import time
 import warnings
@@ -19,14 +21,114 @@ import numpy as np
 import pandas as pd
 from pykrx import stock
 
+try:
+    import bottleneck as bn  # C 이동평균 커널 (선택 의존성)
+except ImportError:
+    bn = None
+
+try:
+    import numba as nb  # 라벨/갭 커널 JIT (선택 의존성)
+except ImportError:
+    nb = None
+
+# 매수 단계 라벨 (커널은 int8 코드 반환, -1 = 무효 → 마지막 원소 "")
+_STAGE_LABELS = np.array(
+    ["1차 매수 대기", "2차 매수 대기", "3차 매수 대기", "3차 매수 완료", ""], dtype=object
+)
+
+if nb is not None:
+    @nb.njit(cache=True)
+    def _label_gap_kernel(price, b1, b2, b3, ok):  # pragma: no cover - numba 설치 시에만
+        """분기 로직을 그대로 둔 채 C 속도로 단계 코드/갭(%)을 산출."""
+        n = price.shape[0]
+        codes = np.full(n, -1, dtype=np.int8)
+        pct = np.full(n, np.nan, dtype=np.float64)
+        for i in range(n):
+            if not ok[i]:
+                continue
+            p = price[i]
+            if p >= b1[i]:
+                codes[i] = 0
+                t = b1[i]
+            elif p >= b2[i]:
+                codes[i] = 1
+                t = b2[i]
+            elif p >= b3[i]:
+                codes[i] = 2
+                t = b3[i]
+            else:
+                codes[i] = 3
+                t = b3[i]
+            pct[i] = abs((t - p) / t * 100.0)
+        return codes, pct
+else:
+    _label_gap_kernel = None
+
 # pykrx 경고 억제 (원치 않으면 주석 처리)
 warnings.filterwarnings("ignore", category=UserWarning, module="pykrx")
 warnings.filterwarnings("ignore", category=FutureWarning, module="pykrx")
 
+# pandas 3.x는 Copy-on-Write 항상 활성 — 2.x에서도 같은 의미론을 강제해
+# 방어용 .copy() 없이도 원본 오염이 없도록 맞춘다
+if pd.__version__ < "3":
+    pd.set_option("mode.copy_on_write", True)
+
 MIN_MCAP = 1.3e12   # 1조 3천억
 FLAG_MCAP = 5.0e12  # 5조 (플래그)
 
 
+# KRX 동시 요청 토큰 버킷 — 스레드 풀 크기와 무관하게 in-flight 요청 수를 제한
+_KRX_TOKENS = Semaphore(8)
+_MAX_RETRIES = 3
+
+
+def _call_with_backoff(fn, *args, **kwargs):
+    """KRX 호출 공통 래퍼.
+
+    무조건 sleep으로 간격을 벌리는 대신, 토큰 버킷으로 동시 요청을 제한하고
+    실제 레이트리밋 신호(HTTP 429)에만 지수 백오프(1s, 2s, 4s)로 재시도한다.
+    그 외 예외는 그대로 전파 — 호출부의 실패 집계가 처리한다.
+    """
+    for attempt in range(_MAX_RETRIES + 1):
+        with _KRX_TOKENS:
+            try:
+                return fn(*args, **kwargs)
+            except Exception as e:
+                status = getattr(getattr(e, "response", None), "status_code", None)
+                if status != 429 or attempt == _MAX_RETRIES:
+                    raise
+        time.sleep(2 ** attempt)
+
+
+def _install_pooled_session() -> None:
+    """pykrx 내부 HTTP 호출에 커넥션 풀 세션 장착 (best-effort).
+
+    요청마다 새 커넥션이면 TCP/TLS 핸드셰이크가 지연의 대부분을 차지한다.
+    pykrx 1.2.x는 webio.set_session 훅으로 세션 주입을 지원하므로 그 경로를
+    우선 사용하고, 훅이 없는 구버전(모듈 전역 requests.get/post 호출)에서만
+    모듈 참조를 Session으로 교체한다 — 전역 참조가 모듈이 아니면 이미
+    세션 기반 구현이므로 건드리지 않는다. 실패 시 조용히 건너뛴다.
+    """
+    try:
+        import types
+
+        import requests
+        from requests.adapters import HTTPAdapter
+        from pykrx.website.comm import webio
+
+        session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=16, pool_maxsize=16)
+        session.mount("https://", adapter)
+        session.mount("http://", adapter)
+        if hasattr(webio, "set_session"):
+            webio.set_session(session)
+        elif isinstance(getattr(webio, "requests", None), types.ModuleType):
+            # 구버전 webio: 모듈 전역 requests.get/post → Session이 같은 인터페이스
+            webio.requests = session
+    except Exception:
+        pass
+
+
 # -------------------------
 # 1) 기준일 탐색 (시총 + OHLCV 동시 유효)
 # -------------------------
@@ -51,17 +153,21 @@ def find_latest_trading_date_with_ohlcv(max_back_days: int = 30, probe_ticker: s
 # -------------------------
 # 2) 대상 리스트업 (시총 필터)
 # -------------------------
-def build_target_list(ref_yyyymmdd: str) -> pd.DataFrame:
+def build_target_list(ref_yyyymmdd: str, name_map: dict | None = None) -> pd.DataFrame:
     """시총 ≥ 1.3조, ≥ 5조 플래그 추가. KOSPI/KOSDAQ 전체에서 필터."""
     cap = stock.get_market_cap_by_ticker(ref_yyyymmdd)
     if cap is None or cap.empty:
         raise RuntimeError(f"시총 데이터가 비어 있습니다: {ref_yyyymmdd}")
 
     cap = cap.reset_index().rename(columns={"티커": "ticker"})
-    cap = cap[["ticker", "시가총액"]].copy().rename(columns={"시가총액": "market_cap"})
-    cap["name"] = cap["ticker"].apply(stock.get_market_ticker_name)
-
-    cap = cap.loc[cap["market_cap"] >= MIN_MCAP].copy()
+    cap = cap[["ticker", "시가총액"]].rename(columns={"시가총액": "market_cap"})
+    if name_map:
+        # dict 기반 map은 C 경로 — 원소별 pykrx 호출(apply) 제거
+        cap["name"] = cap["ticker"].map(name_map).fillna("")
+    else:
+        cap["name"] = cap["ticker"].apply(stock.get_market_ticker_name)
+
+    cap = cap.loc[cap["market_cap"] >= MIN_MCAP]
     cap["is_ge_5trn"] = cap["market_cap"] >= FLAG_MCAP
 
     cap = cap.sort_values(["is_ge_5trn", "market_cap"], ascending=[False, False]).reset_index(drop=True)
@@ -71,8 +177,38 @@ def build_target_list(ref_yyyymmdd: str) -> pd.DataFrame:
 # -------------------------
 # 3) 일봉 수집 + 엔벨로프 계산
 # -------------------------
-def fetch_ohlcv(ticker: str, start: str, end: str) -> pd.DataFrame:
-    df = stock.get_market_ohlcv_by_date(start, end, ticker)
+# 수집 프레임 공용 스키마 — 프레임마다 dtype이 어긋나면 concat이 블록을
+# 업캐스트하며 전체를 다시 쓴다. 수집 단계에서 미리 통일해 fast-path 유지.
+# 가격/거래량은 float32/int32면 충분 (replay 로더와 동일) → 메모리 대역폭 절반.
+_OHLCV_DTYPES = {
+    "date": "datetime64[ns]",
+    "open": "float32",
+    "high": "float32",
+    "low": "float32",
+    "close": "float32",
+    "volume": "int32",
+}
+
+
+def _cast_ohlcv_schema(df: pd.DataFrame) -> pd.DataFrame:
+    return df.astype({k: v for k, v in _OHLCV_DTYPES.items() if k in df.columns})
+
+
+def build_name_map(ref_yyyymmdd: str) -> dict:
+    """티커→종목명 매핑을 1회 구축.
+
+    종목명이 필요한 곳마다 get_market_ticker_name을 호출하면 티커 수만큼
+    반복 호출이 쌓인다 → 기준일의 전체 티커 목록으로 한 번만 만들어 돌려쓴다.
+    """
+    try:
+        tickers = stock.get_market_ticker_list(ref_yyyymmdd, market="ALL")
+        return {t: stock.get_market_ticker_name(t) or "" for t in tickers}
+    except Exception:
+        return {}
+
+
+def fetch_ohlcv(ticker: str, start: str, end: str, name_map: dict | None = None) -> pd.DataFrame:
+    df = _call_with_backoff(stock.get_market_ohlcv_by_date, start, end, ticker)
     if df is None or df.empty:
         return pd.DataFrame()
     df = df.reset_index().rename(
@@ -86,25 +222,111 @@ def fetch_ohlcv(ticker: str, start: str, end: str) -> pd.DataFrame:
         }
     )
     df["ticker"] = ticker
+    if name_map is not None:
+        df["name"] = name_map.get(ticker, "")
+    else:
+        try:
+            df["name"] = stock.get_market_ticker_name(ticker)
+        except Exception:
+            df["name"] = ""
+    return _cast_ohlcv_schema(df[["date", "ticker", "name", "open", "high", "low", "close", "volume"]])
+
+
+def fetch_ohlcv_bulk_day(ds: str, target_set: set) -> pd.DataFrame:
+    """하루치 전 종목 OHLCV를 단일 요청으로 수집 후 대상 종목만 남김.
+
+    티커당 1요청(N회) 대신 날짜당 1요청(D회, 보통 D ≪ N)이라 요청 수가
+    약 N/D배 줄어든다. 휴장일은 빈 응답이므로 그대로 걸러진다.
+
+    ⚠️ 주의: 이 엔드포인트는 수정주가(adjusted)를 지원하지 않는다.
+    조회 구간에 액면분할/감자 등이 있으면 시계열에 가격 단층이 생겨
+    MA/엔벨로프/매수선 계산에 쓰면 안 된다 — 그 용도는 fetch_ohlcv
+    (get_market_ohlcv_by_date, 기본 수정주가) 사용.
+    """
+    df = _call_with_backoff(stock.get_market_ohlcv_by_ticker, ds, market="ALL")
+    if df is None or df.empty:
+        return pd.DataFrame()
+    df = df.reset_index().rename(
+        columns={
+            "티커": "ticker",
+            "시가": "open",
+            "고가": "high",
+            "저가": "low",
+            "종가": "close",
+            "거래량": "volume",
+        }
+    )
+    df = df.loc[df["ticker"].isin(target_set)]
+    df["date"] = pd.to_datetime(ds, format="%Y%m%d")
+    return _cast_ohlcv_schema(df[["date", "ticker", "open", "high", "low", "close", "volume"]])
+
+
+def business_days_between(start: str, end: str) -> List[str]:
+    """start~end(YYYYMMDD) 구간의 영업일 목록. 조회 실패 시 달력일 전체로 폴백
+    (휴장일은 fetch_ohlcv_bulk_day의 빈 응답으로 걸러진다)."""
     try:
-        df["name"] = stock.get_market_ticker_name(ticker)
+        days = stock.get_previous_business_days(fromdate=start, todate=end)
+        return [d.strftime("%Y%m%d") for d in days]
     except Exception:
-        df["name"] = ""
-    return df[["date", "ticker", "name", "open", "high", "low", "close", "volume"]]
+        s = datetime.strptime(start, "%Y%m%d").date()
+        e = datetime.strptime(end, "%Y%m%d").date()
+        return [(s + timedelta(days=i)).strftime("%Y%m%d") for i in range((e - s).days + 1)]
+
+
+def _running_mean_sliced(values: np.ndarray, codes: np.ndarray, window: int) -> np.ndarray:
+    """그룹 경계를 존중하는 이동평균 — 그룹 슬라이스별 연속 배열 커널.
+
+    bottleneck이 있으면 move_mean(C/SIMD), 없으면 누적합 O(N).
+    min_periods=window와 동일하게 윈도우가 차기 전 구간은 NaN이고,
+    NaN이 섞인 윈도우도 NaN — NaN이 윈도우를 벗어나면 다시 값이 나온다.
+    전제: values/codes는 그룹 단위로 연속 정렬되어 있음.
+    """
+    n = len(values)
+    # 출력은 입력 폭을 따름 (float32 입력이면 float32 MA)
+    out_dtype = values.dtype if values.dtype.kind == "f" else np.float64
+    out = np.full(n, np.nan, dtype=out_dtype)
+    if n == 0:
+        return out
+    starts = np.flatnonzero(np.r_[True, codes[1:] != codes[:-1]])
+    ends = np.r_[starts[1:], n]
+    for s, e in zip(starts, ends):
+        if e - s < window:
+            continue
+        if bn is not None:
+            out[s:e] = bn.move_mean(values[s:e], window=window, min_count=window)
+            continue
+        # 누적합만 float64로 — float32 장기 누적 오차 방지 (그룹 길이만큼만 할당)
+        seg = values[s:e]
+        nan_mask = np.isnan(seg)
+        if nan_mask.any():
+            # NaN을 누적합에 그대로 더하면 그룹 꼬리 전체가 오염됨 → 0으로 채우고
+            # 윈도우 내 유효 개수를 따로 세서 꽉 찬 윈도우만 값을 낸다 (move_mean과 동일)
+            csum = np.cumsum(np.where(nan_mask, 0.0, seg), dtype=np.float64)
+            ccnt = np.cumsum(~nan_mask)
+            wsum = csum[window - 1:] - np.r_[0.0, csum[:-window]]
+            wcnt = ccnt[window - 1:] - np.r_[0, ccnt[:-window]]
+            out[s + window - 1:e] = np.where(wcnt == window, wsum / window, np.nan)
+        else:
+            csum = np.cumsum(seg, dtype=np.float64)
+            out[s + window - 1:e] = (csum[window - 1:] - np.r_[0.0, csum[:-window]]) / window
+    return out
 
 
 def add_ma_envelope(df: pd.DataFrame, ma_window: int = 20, band_pct: float = 0.20) -> pd.DataFrame:
     if df.empty:
         return df
 
-    def _calc(g: pd.DataFrame) -> pd.DataFrame:
-        g = g.sort_values("date").copy()
-        g["ma20"] = g["close"].rolling(ma_window, min_periods=ma_window).mean()
-        g["env_upper"] = g["ma20"] * (1 + band_pct)
-        g["env_lower"] = g["ma20"] * (1 - band_pct)
-        return g
-
-    return df.groupby("ticker", group_keys=False).apply(_calc)
+    # 전체를 한 번만 정렬 → 그룹별 DataFrame 생성 없이 평탄 배열에서 일괄 계산
+    df = df.sort_values(["ticker", "date"], kind="stable").reset_index(drop=True)
+    close = df["close"].to_numpy()
+    if close.dtype.kind != "f":
+        close = close.astype(np.float64)
+    codes, _ = pd.factorize(df["ticker"])
+    ma = _running_mean_sliced(close, codes, ma_window)
+    df["ma20"] = ma
+    df["env_upper"] = ma * (1 + band_pct)
+    df["env_lower"] = ma * (1 - band_pct)
+    return df
 
 
 # -------------------------
@@ -120,12 +342,18 @@ def main() -> None:
     outdir = Path(args.outdir)
     outdir.mkdir(parents=True, exist_ok=True)
 
+    # KRX 호출 전 keep-alive 세션 장착
+    _install_pooled_session()
+
     # 기준일 확정
     ref = find_latest_trading_date_with_ohlcv(max_back_days=30)
     print(f"[S1] 기준일(ref) 확정 = {ref}")
 
+    # 티커→종목명 매핑 1회 구축 (이후 단계는 전부 dict 조회)
+    name_map = build_name_map(ref)
+
     # 대상 리스트업
-    targets = build_target_list(ref)
+    targets = build_target_list(ref, name_map)
     print(f"[S1] 대상종목 = {len(targets)}개  샘플티커: {targets['ticker'].head(5).tolist()}")
 
     tgt_path = outdir / f"s1_targets_{ref}.csv"
@@ -136,21 +364,27 @@ def main() -> None:
     start_dt = ref_dt - timedelta(days=max(60, int(args.days * 2.0)))  # 달력일 기준 버퍼
     start = start_dt.strftime("%Y%m%d")
 
+    # 수집은 티커당 1건의 수정주가(adjusted) 요청 × 스레드 풀 동시 실행.
+    # 날짜별 벌크 엔드포인트는 무수정 주가라 MA/매수선이 오염됨 — fetch_ohlcv_bulk_day 주의 참조.
+    # max_workers가 동시 KRX 요청 수 상한이라 별도 sleep 없이도 과도한 폭주를 막는다.
     frames: List[pd.DataFrame] = []
     fail = 0
-    for i, tkr in enumerate(targets["ticker"].tolist(), 1):
-        try:
-            df = fetch_ohlcv(tkr, start, ref)
-            if not df.empty:
-                frames.append(df)
-            else:
-                print(f"[WARN] OHLCV empty: {tkr}")
-        except Exception as e:
-            fail += 1
-            print(f"[ERR] {tkr}: {e}")
-        if i % 20 == 0:
-            print(f"[S1] 진행 {i}/{len(targets)}")
-        time.sleep(0.25)  # 레이트리밋 완화
+    tickers = targets["ticker"].tolist()
+    with ThreadPoolExecutor(max_workers=8) as ex:
+        future_to_tkr = {ex.submit(fetch_ohlcv, tkr, start, ref, name_map): tkr for tkr in tickers}
+        for i, fut in enumerate(as_completed(future_to_tkr), 1):
+            tkr = future_to_tkr[fut]
+            try:
+                df = fut.result()
+                if not df.empty:
+                    frames.append(df)
+                else:
+                    print(f"[WARN] OHLCV empty: {tkr}")
+            except Exception as e:
+                fail += 1
+                print(f"[ERR] {tkr}: {e}")
+            if i % 20 == 0:
+                print(f"[S1] 진행 {i}/{len(tickers)}")
 
     print(f"[S1] OHLCV 성공 {len(frames)}종 / 실패 {fail}종")
     if not frames:
@@ -158,71 +392,62 @@ def main() -> None:
 
     # 엔벨로프 계산 (풀히스토리로 MA/밴드 먼저 계산)
     ohlcv_all = pd.concat(frames, ignore_index=True)
+    # 티커는 저카디널리티 반복 문자열 → category 보관 (str 해시 대신 정수 코드로 그룹/비교)
+    ohlcv_all["ticker"] = ohlcv_all["ticker"].astype("category")
     env = add_ma_envelope(ohlcv_all, ma_window=20, band_pct=args.band)
 
-    # === 표시 슬라이스: 종목별 최근 N(=args.days) 봉만 남김 (계산은 위에서 이미 전체 구간으로 수행) ===
-    env = env.groupby("ticker", group_keys=False).apply(lambda g: g.sort_values("date").tail(args.days))
+    # === 표시 슬라이스: 종목별 최근 N(=args.days) 봉만 남김 (계산은 위에서 이미 전체 구간으로 수행)
+    # add_ma_envelope가 (ticker, date) 정렬을 보장하므로 그룹 역순 번호 마스크 한 번이면 충분 ===
+    rev_rank = env.groupby("ticker", sort=False).cumcount(ascending=False)
+    env = env.loc[rev_rank < args.days].reset_index(drop=True)
 
     # ===== 추가 컬럼 (buy1~3, pos, gap) =====
-    # 매수선
-    env["buy1"] = env["env_lower"]
-    env["buy2"] = env["buy1"] * 0.9
-    env["buy3"] = env["buy2"] * 0.9
-
-    # 라벨링 함수 (pos_close/pos_low 동일 기준, ma20 없으면 공란)
-    def label_stage(price: float, b1: float, b2: float, b3: float) -> str:
-        if pd.isna(price) or pd.isna(b1) or pd.isna(b2) or pd.isna(b3):
-            return ""
-        if price >= b1:
-            return "1차 매수 대기"
-        elif price >= b2:
-            return "2차 매수 대기"
-        elif price >= b3:
-            return "3차 매수 대기"
+    # 매수선: env_lower 1회 읽기 × [1, 0.9, 0.81] 브로드캐스트로 세 컬럼 동시 산출
+    lower = env["env_lower"].to_numpy()
+    env[["buy1", "buy2", "buy3"]] = lower[:, None] * np.array([1.0, 0.9, 0.81], dtype=lower.dtype)
+
+    # 라벨/갭 산출 — 행 단위 apply 대신 np.select 벡터 연산 (ma20 없으면 공란)
+    b1 = env["buy1"].to_numpy(dtype=np.float64)
+    b2 = env["buy2"].to_numpy(dtype=np.float64)
+    b3 = env["buy3"].to_numpy(dtype=np.float64)
+    # 매수선 3종은 전부 ma20 파생 → NaN 검사는 ma20 마스크 1개로 충분.
+    # 가격별 유효 마스크도 컬럼당 1회만 계산해 라벨/갭 산출이 공유한다.
+    valid = env["ma20"].notna().to_numpy()
+
+    def _stage_and_gap(price: np.ndarray, ok: np.ndarray):
+        """(단계 라벨, 다음 매수선까지 갭 % 숫자) 동시 산출.
+
+        pos_*: buy1 이상→1차 대기 … buy3 미만→3차 완료.
+        gap_*: 1차 대기→buy1, 2차 대기→buy2, 그 외(3차 대기/완료)→buy3 기준.
+        갭은 NaN 전파 산술로 숫자 그대로 반환 — 문자열 포매팅은 저장 직전 1회.
+        numba가 있으면 JIT 커널로 한 패스, 없으면 np.select 벡터 경로.
+        """
+        if _label_gap_kernel is not None:
+            codes, pct = _label_gap_kernel(price, b1, b2, b3, ok)
+            labels = _STAGE_LABELS[np.where(codes >= 0, codes, 4)]
         else:
-            return "3차 매수 완료"
-
-    env["pos_close"] = env.apply(
-        lambda r: label_stage(r["close"], r["buy1"], r["buy2"], r["buy3"]) if pd.notna(r.get("ma20")) else "",
-        axis=1,
-    )
-    env["pos_low"] = env.apply(
-        lambda r: label_stage(r["low"], r["buy1"], r["buy2"], r["buy3"]) if pd.notna(r.get("ma20")) else "",
-        axis=1,
-    )
-
-    # gap 계산 (문자열 % 표기, 절댓값, 소수 1자리)
-    def gap_to_next(price: float, stage: str, b1: float, b2: float, b3: float) -> str:
-        if pd.isna(price) or pd.isna(b1) or pd.isna(b2) or pd.isna(b3) or not stage:
-            return ""
-        if stage == "1차 매수 대기":
-            target = b1
-        elif stage == "2차 매수 대기":
-            target = b2
-        else:  # "3차 매수 대기" 또는 "3차 매수 완료"는 모두 3차 매수선 기준
-            target = b3
-        pct = abs((target - price) / target * 100.0)
-        return f"{pct:.1f}%"
-
-    env["gap_close_pct"] = env.apply(
-        lambda r: gap_to_next(r["close"], r["pos_close"], r["buy1"], r["buy2"], r["buy3"]),
-        axis=1,
-    )
-    env["gap_low_pct"] = env.apply(
-        lambda r: gap_to_next(r["low"], r["pos_low"], r["buy1"], r["buy2"], r["buy3"]),
-        axis=1,
-    )
+            conds = [ok & (price >= b1), ok & (price >= b2), ok & (price >= b3), ok]
+            labels = np.select(conds, list(_STAGE_LABELS[:4]), default="")
+            target = np.select([price >= b1, price >= b2], [b1, b2], default=b3)
+            # 피연산자 NaN(가격/매수선)이 결과 NaN으로 자연 전파 — 별도 분기 불필요
+            with np.errstate(invalid="ignore", divide="ignore"):
+                pct = np.abs((target - price) / target * 100.0)
+        return labels, np.where(ok, pct, np.nan)
+
+    close_arr = env["close"].to_numpy(dtype=np.float64)
+    low_arr = env["low"].to_numpy(dtype=np.float64)
+    ok_close = valid & ~np.isnan(close_arr)
+    ok_low = valid & ~np.isnan(low_arr)
+    # 갭 컬럼은 계산 구간 내내 숫자(float)로 유지
+    env["pos_close"], env["gap_close_pct"] = _stage_and_gap(close_arr, ok_close)
+    env["pos_low"], env["gap_low_pct"] = _stage_and_gap(low_arr, ok_low)
 
     # ===== 저장 직전 보강/정리/저장 =====
     env_path = outdir / f"s1_envelope_{ref}.csv"
 
-    # name 컬럼 보강 (없으면 티커→이름 매핑)
+    # name 컬럼 보강 (없으면 티커→이름 매핑 — 미리 구축한 name_map 재사용)
     if "name" not in env.columns:
-        try:
-            from pykrx import stock as _stock
-            env["name"] = env["ticker"].map(lambda t: _stock.get_market_ticker_name(t) or "")
-        except Exception:
-            env["name"] = ""
+        env["name"] = env["ticker"].map(name_map).fillna("")
 
     # 컬럼 순서 안전 재정렬 (있는 컬럼만 사용)
     preferred = [
@@ -234,8 +459,30 @@ def main() -> None:
     others   = [c for c in env.columns if c not in existing]
     env = env[existing + others]
 
+    # 갭 % 문자열 포매팅 (절댓값/소수 1자리/'%' — 저장 직전 한 번만, NaN은 공란)
+    for col in ("gap_close_pct", "gap_low_pct"):
+        if col in env.columns:
+            v = env[col].to_numpy(dtype=np.float64)
+            txt = pd.Series(np.where(np.isnan(v), 0.0, v)).map("{:.1f}%".format).to_numpy()
+            env[col] = np.where(np.isnan(v), "", txt)
+
     # CSV 저장 (엑셀 한글 깨짐 방지)
-    env.to_csv(env_path, index=False, encoding="utf-8-sig")
+    try:
+        # pyarrow C++ CSV 직렬화 (to_csv의 행 단위 파이썬 포매팅 회피)
+        import pyarrow as pa
+        from pyarrow import csv as pacsv
+        table = pa.Table.from_pandas(env, preserve_index=False)
+        with open(env_path, "wb") as f:
+            f.write(b"\xef\xbb\xbf")  # 엑셀 한글 호환 BOM (utf-8-sig)
+            pacsv.write_csv(table, f, write_options=pacsv.WriteOptions(include_header=True))
+    except Exception:
+        env.to_csv(env_path, index=False, encoding="utf-8-sig")
+
+    # parquet 동반 저장 — 후속 처리에서 CSV 재파싱 생략용 (실패해도 CSV가 원본)
+    try:
+        env.to_parquet(env_path.with_suffix(".parquet"))
+    except Exception:
+        pass
 
     print(f"[S1] 대상 리스트: {tgt_path}")
     print(f"[S1] 엔벨로프 데이터(+buy1~3,pos,gap% | 최근 {args.days}봉 표시): {len(env):,} rows → {env_path}")
@@ -20,6 +20,11 @@ from typing import Optional, Iterable
 import pandas as pd
 import numpy as np
 
+# pandas 3.x는 Copy-on-Write 항상 활성 — 2.x에서도 같은 의미론을 강제해
+# 방어용 .copy() 없이도 원본 오염이 없도록 맞춘다
+if pd.__version__ < "3":
+    pd.set_option("mode.copy_on_write", True)
+
 # ===========================
 # 0) 설정
 # ===========================
@@ -44,31 +49,92 @@ class Config:
 # ===========================
 # 1) 데이터 로딩
 # ===========================
+# 시세 CSV에서 흔한 날짜 표기 — 포맷 고정 파싱이 요소별 추론보다 수십 배 빠름
+_DATE_FORMATS = ("%Y-%m-%d", "%Y%m%d")
+
+
+def _parse_dates_known(s: pd.Series, date_format: Optional[str] = None) -> pd.Series:
+    """알려진 포맷을 우선 시도하는 날짜 파싱.
+
+    포맷이 비널 값 전부에 들어맞으면 그 결과를 쓰고, 아니면 다음 포맷 →
+    최후에 추론 파싱(errors="coerce")으로 폴백.
+    """
+    n_na = int(s.isna().sum())
+    formats = (date_format,) if date_format else _DATE_FORMATS
+    for fmt in formats:
+        parsed = pd.to_datetime(s, format=fmt, errors="coerce")
+        if int(parsed.isna().sum()) == n_na:
+            return parsed
+    return pd.to_datetime(s, errors="coerce")
+
+
 def load_prices_csv(
     path: str,
     cfg: Optional[Config] = None,
     dtypes: Optional[dict] = None,
     parse_dates: Optional[Iterable[str]] = None,
+    date_format: Optional[str] = None,
 ) -> pd.DataFrame:
     """CSV에서 일봉 시세 로드.
     기대 컬럼: [date, open, high, low, close, volume, ticker, market_cap]
     - date: 날짜/시각 가능(naive면 로컬 해석), 가능한 한 날짜로 파싱
+    - date_format: 알려진 날짜 포맷(예: "%Y%m%d") — 미지정 시 표준 포맷 순차 시도
     - market_cap: 원 단위 시총(숫자)
     """
     cfg = cfg or Config()
     parse_dates = parse_dates or [cfg.col_date]
 
-    df = pd.read_csv(path, dtype=dtypes, low_memory=False)
+    try:
+        # pyarrow 엔진: 멀티스레드 파싱 (C 엔진은 단일 스레드)
+        df = pd.read_csv(path, dtype=dtypes, engine="pyarrow")
+    except Exception:
+        # pyarrow 미설치 또는 변칙 CSV → 기본 엔진으로 폴백
+        df = pd.read_csv(path, dtype=dtypes, low_memory=False)
     # 날짜 파싱
     if cfg.col_date in df.columns:
-        df[cfg.col_date] = pd.to_datetime(df[cfg.col_date], errors="coerce")
+        df[cfg.col_date] = _parse_dates_known(df[cfg.col_date], date_format)
     # 정렬
     df = df.sort_values([cfg.col_ticker, cfg.col_date]).reset_index(drop=True)
+    # 티커는 저카디널리티 반복 문자열 → category 보관 (str 해시 대신 정수 코드로 그룹/비교)
+    if cfg.col_ticker in df.columns:
+        df[cfg.col_ticker] = df[cfg.col_ticker].astype("category")
     return df
 
 # ===========================
 # 2) 지표 계산 (20MA ±20% 엔벨로프)
 # ===========================
+def _group_rolling_mean(values: np.ndarray, codes: np.ndarray, window: int) -> np.ndarray:
+    """그룹 경계를 존중하는 이동평균. 누적합 기반 O(N) — 윈도우 길이와 무관.
+
+    전제: values/codes는 그룹 단위로 연속 정렬되어 있음.
+    min_periods=window 와 동일하게 윈도우가 차기 전 구간은 NaN이고,
+    NaN이 섞인 윈도우도 NaN — 단, NaN이 윈도우를 벗어나면 다시 값이 나온다
+    (누적합에 NaN을 그대로 더하면 그룹 꼬리 전체가 오염되므로 0으로 채우고
+    윈도우 내 유효 개수를 따로 센다).
+    """
+    n = len(values)
+    out = np.full(n, np.nan)
+    if n == 0:
+        return out
+    starts = np.flatnonzero(np.r_[True, codes[1:] != codes[:-1]])
+    ends = np.r_[starts[1:], n]
+    for s, e in zip(starts, ends):
+        if e - s < window:
+            continue
+        seg = values[s:e]
+        nan_mask = np.isnan(seg)
+        if nan_mask.any():
+            csum = np.cumsum(np.where(nan_mask, 0.0, seg))
+            ccnt = np.cumsum(~nan_mask)
+            wsum = csum[window - 1:] - np.r_[0.0, csum[:-window]]
+            wcnt = ccnt[window - 1:] - np.r_[0, ccnt[:-window]]
+            out[s + window - 1:e] = np.where(wcnt == window, wsum / window, np.nan)
+        else:
+            csum = np.cumsum(seg)
+            out[s + window - 1:e] = (csum[window - 1:] - np.r_[0.0, csum[:-window]]) / window
+    return out
+
+
 def enrich_with_envelope(df: pd.DataFrame, cfg: Optional[Config] = None) -> pd.DataFrame:
     """각 티커별 20일 이동평균과 엔벨로프(±band_pct) 계산.
     추가 컬럼:
@@ -82,14 +148,14 @@ def enrich_with_envelope(df: pd.DataFrame, cfg: Optional[Config] = None) -> pd.D
         if c not in df.columns:
             raise ValueError(f"필수 컬럼 누락: {c}")
 
-    def _calc(g: pd.DataFrame) -> pd.DataFrame:
-        g = g.copy()
-        g["ma20"] = g[cfg.col_close].rolling(cfg.ma_window, min_periods=cfg.ma_window).mean()
-        g["env_upper"] = g["ma20"] * (1 + cfg.band_pct)
-        g["env_lower"] = g["ma20"] * (1 - cfg.band_pct)
-        return g
-
-    out = df.groupby(cfg.col_ticker, group_keys=False).apply(_calc)
+    # (ticker, date) 정렬 보장 후 평탄 배열에서 한 번에 계산
+    out = df.sort_values([cfg.col_ticker, cfg.col_date], kind="stable").reset_index(drop=True)
+    close = out[cfg.col_close].to_numpy(dtype=np.float64)
+    codes, _ = pd.factorize(out[cfg.col_ticker])
+    ma = _group_rolling_mean(close, codes, cfg.ma_window)
+    out["ma20"] = ma
+    out["env_upper"] = ma * (1 + cfg.band_pct)
+    out["env_lower"] = ma * (1 - cfg.band_pct)
     return out
 
 # ===========================
@@ -108,15 +174,26 @@ def filter_by_market_cap(df: pd.DataFrame, cfg: Optional[Config] = None) -> pd.D
         raise ValueError(f"시가총액 컬럼 '{cfg.col_mcap}' 이(가) 없습니다.")
 
     f = df[cfg.col_mcap] >= cfg.min_mcap_won
-    out = df.loc[f].copy()
+    out = df.loc[f]
     out[DEF_MC_FLAG] = out[cfg.col_mcap] >= cfg.highlight_mcap_won
     return out
 
 # ===========================
 # 4) 유틸리티
 # ===========================
+def pct_gap_vec(a, b) -> np.ndarray:
+    """pct_gap의 배열 버전. Series/ndarray를 받아 한 번에 계산.
+    a가 NaN/0이거나 b가 NaN이면 NaN.
+    """
+    a = np.asarray(a, dtype=np.float64)
+    b = np.asarray(b, dtype=np.float64)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        out = (b - a) / a * 100.0
+    return np.where(np.isnan(a) | np.isnan(b) | (a == 0), np.nan, out)
+
+
 def pct_gap(a: float, b: float) -> float:
-    """a와 b의 상대 괴리율(%).
+    """a와 b의 상대 괴리율(%). 스칼라 편의 래퍼 — 배열은 pct_gap_vec 사용.
     정의: (b - a) / a * 100
     """
     if a is None or b is None or pd.isna(a) or pd.isna(b) or a == 0:
@@ -125,10 +202,23 @@ def pct_gap(a: float, b: float) -> float:
 
 
 def latest_snapshot(df: pd.DataFrame, cfg: Optional[Config] = None) -> pd.DataFrame:
-    """티커별 가장 최신 일자 레코드만 반환(스냅샷용)."""
+    """티커별 가장 최신 일자 레코드만 반환(스냅샷용).
+
+    (ticker, date) 정렬 입력(load_prices_csv/enrich_with_envelope가 보장)이면
+    drop_duplicates(keep="last") 선형 스캔 한 번으로 끝. 비정렬 입력만 정렬 후 동일 처리.
+    """
     cfg = cfg or Config()
-    idx = df.groupby(cfg.col_ticker)[cfg.col_date].idxmax()
-    return df.loc[idx].reset_index(drop=True)
+    n = len(df)
+    if n == 0:
+        return df.reset_index(drop=True)
+
+    codes, _ = pd.factorize(df[cfg.col_ticker])
+    boundary = codes[:-1] != codes[1:]
+    dates = df[cfg.col_date].to_numpy()
+    is_sorted = bool(np.all(codes[:-1] <= codes[1:]) and np.all(boundary | (dates[:-1] <= dates[1:])))
+    if not is_sorted:
+        df = df.sort_values([cfg.col_ticker, cfg.col_date], kind="stable")
+    return df.drop_duplicates(subset=cfg.col_ticker, keep="last").reset_index(drop=True)
 
 # ===========================
 # 5) S1 보조: A/B/C 레벨 산출(스냅샷)
@@ -155,21 +245,46 @@ def s1_compute_levels(snapshot_df: pd.DataFrame, cfg: Optional[Config] = None) -
         if c not in snapshot_df.columns:
             raise ValueError(f"S1 레벨 계산 전 '{c}' 컬럼이 필요합니다. 먼저 enrich_with_envelope() 호출 여부 확인.")
 
-    df = snapshot_df.copy()
-    df[S1_A] = df["env_lower"]
-    df[S1_B] = df[S1_A] * 0.9
-    df[S1_C] = df[S1_B] * 0.9
+    close = snapshot_df[cfg.col_close].to_numpy(dtype=np.float64)
+    a = snapshot_df["env_lower"].to_numpy(dtype=np.float64)
+    b = a * 0.9
+    c = b * 0.9
     # 현재가 대비 괴리율(양수면 아래쪽에 있음 = 더 내려가야 닿음)
-    df[S1_GAP_A] = (df[S1_A] - df[cfg.col_close]) / df[cfg.col_close] * 100.0
-    df[S1_GAP_B] = (df[S1_B] - df[cfg.col_close]) / df[cfg.col_close] * 100.0
-    df[S1_GAP_C] = (df[S1_C] - df[cfg.col_close]) / df[cfg.col_close] * 100.0
-    return df
+    # (X - close)/close*100 = X*(100/close) - 100 — 나눗셈 1회를 세 레벨이 공유,
+    # out= 재사용으로 레벨당 임시 배열 1개만 할당
+    with np.errstate(divide="ignore"):  # close=0 → inf (기존 Series 나눗셈과 동일)
+        inv100 = np.divide(100.0, close)
+    new_cols = {S1_A: a, S1_B: b, S1_C: c}
+    for col, level in ((S1_GAP_A, a), (S1_GAP_B, b), (S1_GAP_C, c)):
+        gap = np.multiply(level, inv100)
+        np.subtract(gap, 100.0, out=gap)
+        new_cols[col] = gap
+    # assign: 입력 프레임은 건드리지 않고 새 컬럼만 얹은 새 프레임 반환 (CoW라 데이터 복사 없음)
+    return snapshot_df.assign(**new_cols)
 
 # ===========================
 # 6) 포맷팅 헬퍼
 # ===========================
+def format_market_cap_krw_series(s: pd.Series) -> pd.Series:
+    """format_market_cap_krw의 Series 버전.
+
+    apply 대신 구간 마스크별로 해당 원소만 포매팅 — 파이썬 함수 호출은
+    실제 문자열을 만드는 원소 수만큼만 발생한다.
+    """
+    v = s.to_numpy(dtype=np.float64)
+    out = np.full(len(v), "", dtype=object)
+    m_trn = v >= 1e12
+    m_eok = (v >= 1e8) & ~m_trn
+    m_won = ~np.isnan(v) & (v < 1e8)
+    out[m_trn] = [f"{x/1e12:.2f}조" for x in v[m_trn]]
+    out[m_eok] = [f"{x/1e8:.0f}억" for x in v[m_eok]]
+    out[m_won] = [f"{x:.0f}원" for x in v[m_won]]
+    return pd.Series(out, index=s.index)
+
+
 def format_market_cap_krw(mcap_won: float) -> str:
-    """원 단위 시총을 사람이 읽기 쉽게(조/억) 표현."""
+    """원 단위 시총을 사람이 읽기 쉽게(조/억) 표현. 스칼라 편의 래퍼 —
+    컬럼 단위는 format_market_cap_krw_series 사용."""
     if pd.isna(mcap_won):
         return ""
     if mcap_won >= 1e12: